@@ -1,4 +1,5 @@
-import os
+import os, time
+import db
 
 #### NOTIFICATION ####
 MESSAGE = '''\
@@ -15,6 +16,26 @@ MESSAGE = '''\
 # Toggle automatic generation of search term variants for each query
 ENABLE_VARIANTS = os.getenv("ENABLE_VARIANTS", "true").lower() not in ("0", "false", "no", "off")
 
+#### PARAMETER CACHE ####
+# Seconds a value read from the parameters table is reused before querying the database again.
+# Each process keeps its own cache and the Web UI writes parameters from another process,
+# so a change made there only takes effect here once the cached value expires.
+PARAMETER_CACHE_TTL = 60
+_parameter_cache = {}
+
+
+def get_cached_parameter(name, ttl=PARAMETER_CACHE_TTL):
+    """Return db.get_parameter(name), reusing the value for ttl seconds. Missing values are not cached."""
+    now = time.monotonic()
+    cached = _parameter_cache.get(name)
+    if cached is not None and cached[1] > now:
+        return cached[0]
+    value = db.get_parameter(name)
+    if value is not None:
+        _parameter_cache[name] = (value, now + ttl)
+    return value
+
+
 #### WEB UI SETTINGS ####
 # Web UI port
 WEB_UI_PORT = int(os.getenv("PORT", 8080))
@@ -1,15 +1,19 @@
-import db, configuration_values, requests
+import db, configuration_values, re, requests, string, time
+from functools import lru_cache
+from queue import Empty
 from pyVintedVN import Vinted, requester
-from urllib.parse import urlparse, parse_qs, urlencode, urlunparse
+from urllib.parse import urlparse, parse_qs, quote_plus, urlencode, urlunparse
 from typing import Optional
 from logger import get_logger
 
 from fuzzy_matcher import (
     DEFAULT_FUZZY_THRESHOLD,
+    _build_fuzzy_targets,
     _expand_search_text_variants,
+    _normalize_text,
     decode_query_name,
     encode_query_name,
-    find_best_fuzzy_match,
+    find_best_fuzzy_matches,
 )
 
 from valuation_engine import (
@@ -30,6 +34,51 @@ logger = get_logger(__name__)
 
 _valuation_engine: Optional[ValuationEngine] = None
 
+# Value of the search_text parameter inside an encoded query string
+_SEARCH_TEXT_VALUE_RE = re.compile(r'(?:^|&)search_text=([^&]*)')
+
+
+@lru_cache(maxsize=1024)
+def _cached_urlparse(url):
+    """Return ``urlparse(url)``, memoized since stored query URLs repeat."""
+
+    return urlparse(url)
+
+
+@lru_cache(maxsize=1024)
+def _cached_parse_qs(query_string):
+    """Return ``parse_qs(query_string)`` as an immutable tuple of ``(key, values)`` pairs."""
+
+    return tuple((key, tuple(values)) for key, values in parse_qs(query_string).items())
+
+
+@lru_cache(maxsize=8)
+def _parse_message_template(template):
+    """
+    Split a message template into (literal, field name) segments once.
+    Returns None when the template uses conversions, format specs or non-keyword fields,
+    in which case it is rendered with str.format_map instead.
+    """
+    segments = []
+    for literal, field_name, format_spec, conversion in string.Formatter().parse(template):
+        if field_name is not None and (not field_name.isidentifier() or format_spec or conversion):
+            return None
+        segments.append((literal, field_name))
+    return tuple(segments)
+
+
+def _render_message(template, fields):
+    """Fill a message template with the values in fields, like template.format(**fields)."""
+    segments = _parse_message_template(template)
+    if segments is None:
+        return template.format_map(fields)
+    return "".join([literal if name is None else literal + str(fields[name]) for literal, name in segments])
+
+
+# Seller countries resolved through the Vinted API, keyed by profile id
+_USER_COUNTRY_CACHE_SIZE = 4096
+_user_country_cache = {}
+
 
 def _get_valuation_engine() -> ValuationEngine:
     """Return a singleton valuation engine instance."""
@@ -48,8 +97,8 @@ def process_query(query, name=None):
     2. Ensuring the order flag is set to "newest_first"
     3. Removing time and search_id parameters
     4. Rebuilding the query string and URL
-    5. Checking if the query already exists in the database
-    6. Adding the query to the database if it doesn't exist
+    5. Checking which of the resulting queries already exist in the database
+    6. Adding the missing queries to the database in one batch
 
     Args:
         query (str): The Vinted query URL
@@ -79,19 +128,11 @@ def process_query(query, name=None):
     stored_name = encode_query_name(display_name, base_search_text)
 
     base_params = {key: list(value) for key, value in query_params.items()}
+    scheme, netloc, path, url_params, _, fragment = parsed_url
 
     def build_processed_query(params):
         new_query = urlencode(params, doseq=True)
-        return urlunparse(
-            (
-                parsed_url.scheme,
-                parsed_url.netloc,
-                parsed_url.path,
-                parsed_url.params,
-                new_query,
-                parsed_url.fragment,
-            )
-        )
+        return urlunparse((scheme, netloc, path, url_params, new_query, fragment))
 
     variant_queries = []
     if base_search_text and configuration_values.ENABLE_VARIANTS:
@@ -101,10 +142,21 @@ def process_query(query, name=None):
             base_search_text,
             len(expanded_terms),
         )
+        # Only search_text changes between variants, so encode the other parameters once
+        # and splice each quoted variant into the search_text slot
+        base_query = urlencode(base_params, doseq=True)
+        search_text_match = (
+            _SEARCH_TEXT_VALUE_RE.search(base_query) if len(base_params['search_text']) == 1 else None
+        )
+        params = dict(base_params)
         for variant in expanded_terms:
-            params = {key: list(value) for key, value in base_params.items()}
-            params['search_text'] = [variant]
-            variant_queries.append(build_processed_query(params))
+            if search_text_match:
+                new_query = (base_query[:search_text_match.start(1)] + quote_plus(variant)
+                             + base_query[search_text_match.end(1):])
+                variant_queries.append(urlunparse((scheme, netloc, path, url_params, new_query, fragment)))
+            else:
+                params['search_text'] = [variant]
+                variant_queries.append(build_processed_query(params))
     else:
         if base_search_text and not configuration_values.ENABLE_VARIANTS:
             logger.info(
@@ -113,12 +165,11 @@ def process_query(query, name=None):
             )
         variant_queries.append(build_processed_query(base_params))
 
-    added_count = 0
-    for processed_query in variant_queries:
-        if db.is_query_in_db(processed_query):
-            continue
-        db.add_query_to_db(processed_query, stored_name)
-        added_count += 1
+    # One lookup for every variant, then a single insert for the missing ones
+    existing_queries = db.get_existing_queries(variant_queries)
+    new_queries = [q for q in dict.fromkeys(variant_queries) if q not in existing_queries]
+    db.add_queries_to_db(new_queries, stored_name)
+    added_count = len(new_queries)
 
     if added_count == 0:
         return "Query already exists.", False
@@ -138,10 +189,10 @@ def get_formatted_query_list():
     all_queries = db.get_queries()
     entries = []
     for query in all_queries:
-        parsed_url = urlparse(query[1])
-        query_params = parse_qs(parsed_url.query)
+        parsed_url = _cached_urlparse(query[1])
+        query_params = dict(_cached_parse_qs(parsed_url.query))
         display_name, _ = decode_query_name(query[3])
-        fallback = query_params.get('search_text', [None])[0]
+        fallback = query_params.get('search_text', (None,))[0]
         entry = display_name or fallback or query[1]
         entries.append(entry)
 
@@ -241,6 +292,10 @@ def get_user_country(profile_id):
     Returns:
         str: The user's country code (2-letter ISO code) or "XX" if it can't be determined
     """
+    cached_country = _user_country_cache.get(profile_id)
+    if cached_country is not None:
+        return cached_country
+
     # Users are shared between all Vinted platforms, so we can use whatever locale we want
     url = f"https://www.vinted.fr/api/v2/users/{profile_id}?localize=false"
     response = requester.get(url)
@@ -257,6 +312,12 @@ def get_user_country(profile_id):
             user_country = "XX"
     else:
         user_country = response.json()["user"]["country_iso_code"]
+
+    # The "XX" fallback is not cached so the seller gets looked up again once the rate limit clears
+    if user_country != "XX":
+        if len(_user_country_cache) >= _USER_COUNTRY_CACHE_SIZE:
+            _user_country_cache.clear()
+        _user_country_cache[profile_id] = user_country
     return user_country
 
 
@@ -278,7 +339,7 @@ def process_items(queue):
     vinted = Vinted()
 
     # Get the number of items per query from the database
-    items_per_query = int(db.get_parameter("items_per_query"))
+    items_per_query = int(configuration_values.get_cached_parameter("items_per_query"))
 
     # for each keyword we parse data
     for query in all_queries:
@@ -289,125 +350,189 @@ def process_items(queue):
         logger.info(f"Scraped {len(data)} items for query: {query[1]}")
 
 
+# Upper bound on payloads handled per clear_item_queue call, so one call can't run indefinitely
+MAX_PAYLOADS_PER_DRAIN = 50
+
+
 def clear_item_queue(items_queue, new_items_queue):
     """
-    Process items from the items_queue.
+    Process the payloads waiting in the items_queue, up to MAX_PAYLOADS_PER_DRAIN per call.
     This function is scheduled to run frequently.
     """
-    if not items_queue.empty():
-        payload = items_queue.get()
-        if isinstance(payload, (list, tuple)):
-            if len(payload) >= 4:
-                data, query_id, query_url, stored_name = payload[:4]
-            elif len(payload) == 3:
-                data, query_id, query_url = payload
-                stored_name = None
-            else:
-                data, query_id = payload[:2]
-                query_url = None
-                stored_name = None
-        else:
-            data = payload
-            query_id = None
-            query_url = None
-            stored_name = None
+    if items_queue.empty():
+        return
+
+    # Shared by every payload of this drain
+    allowlist = db.get_allowlist()
+    # "XX" means the country couldn't be determined, those items are let through
+    allowed_countries = frozenset(allowlist + ["XX"]) if allowlist != 0 else None
+    valuation_engine = _get_valuation_engine()
 
-        if query_id is None:
-            logger.warning("Received item payload without query id; skipping processing.")
-            return
+    for _ in range(MAX_PAYLOADS_PER_DRAIN):
+        try:
+            payload = items_queue.get_nowait()
+        except Empty:
+            break
+        _process_item_payload(payload, new_items_queue, allowed_countries, valuation_engine)
 
-        _, base_search_text = decode_query_name(stored_name)
-        if base_search_text is None and query_url:
-            parsed_query = urlparse(query_url)
-            query_params = parse_qs(parsed_query.query)
-            base_search_text = query_params.get('search_text', [None])[0]
 
-        allowlist = db.get_allowlist()
-        allowed_countries = allowlist if allowlist != 0 else None
+def _process_item_payload(payload, new_items_queue, allowed_countries, valuation_engine):
+    """
+    Filter the items of one scraped payload and queue notifications for the new ones.
+    """
+    if isinstance(payload, (list, tuple)):
+        if len(payload) >= 4:
+            data, query_id, query_url, stored_name = payload[:4]
+        elif len(payload) == 3:
+            data, query_id, query_url = payload
+            stored_name = None
+        else:
+            data, query_id = payload[:2]
+            query_url = None
+            stored_name = None
+    else:
+        data = payload
+        query_id = None
+        query_url = None
+        stored_name = None
+
+    if query_id is None:
+        logger.warning("Received item payload without query id; skipping processing.")
+        return
+
+    _, base_search_text = decode_query_name(stored_name)
+    if base_search_text is None and query_url:
+        parsed_query = _cached_urlparse(query_url)
+        query_params = dict(_cached_parse_qs(parsed_query.query))
+        base_search_text = query_params.get('search_text', (None,))[0]
+
+    # The search text is shared by every item of the payload, prepare it for fuzzy matching once
+    if base_search_text:
+        normalized_base = _normalize_text(base_search_text)
+        fuzzy_targets = _build_fuzzy_targets(base_search_text)
+        fuzzy_choices = tuple(fuzzy_targets)
+
+    # Prefetch the query timestamp and the already-stored items once instead of per item
+    last_query_timestamp = db.get_last_timestamp(query_id)
+    existing_ids = db.get_existing_item_ids([item.id for item in data])
+    # Timestamp of the newest skipped item not yet written, flushed once after the loop
+    pending_timestamp = None
+
+    # Score every item that can reach the fuzzy check in one batch
+    fuzzy_results = {}
+    if base_search_text:
+        candidates = [
+            item for item in data
+            if (last_query_timestamp is None or item.raw_timestamp > last_query_timestamp)
+            and item.id not in existing_ids
+        ]
+        matches = find_best_fuzzy_matches(
+            normalized_base,
+            fuzzy_targets,
+            fuzzy_choices,
+            [item.title for item in candidates],
+            [item.brand_title for item in candidates],
+            threshold=DEFAULT_FUZZY_THRESHOLD,
+        )
+        fuzzy_results = {item.id: match for item, match in zip(candidates, matches)}
 
+    try:
         for item in reversed(data):
 
             # If already in db, pass
-            last_query_timestamp = db.get_last_timestamp(query_id)
             if last_query_timestamp is not None and last_query_timestamp >= item.raw_timestamp:
-                pass
+                continue
             # In case of multiple queries, we need to check if the item is already in the db
-            elif db.is_item_in_db_by_id(item.id) is True:
-                # We update the timestamp
-                db.update_last_timestamp(query_id, item.raw_timestamp)
-                pass
+            if item.id in existing_ids:
+                last_query_timestamp = pending_timestamp = item.raw_timestamp
+                continue
             # If there's an allowlist and
             # If the user's country is not in the allowlist, we just update the timestamp
-            elif allowed_countries is not None and (
-                    get_user_country(item.raw_data["user"]["id"])) not in (allowed_countries + ["XX"]):
-                db.update_last_timestamp(query_id, item.raw_timestamp)
-                pass
-            else:
-                fuzzy_result = None
-                if base_search_text:
-                    fuzzy_result = find_best_fuzzy_match(
+            if allowed_countries is not None and (
+                    get_user_country(item.raw_data["user"]["id"])) not in allowed_countries:
+                last_query_timestamp = pending_timestamp = item.raw_timestamp
+                continue
+
+            fuzzy_result = None
+            if base_search_text:
+                fuzzy_result = fuzzy_results.get(item.id)
+                if fuzzy_result is None:
+                    last_query_timestamp = pending_timestamp = item.raw_timestamp
+                    logger.debug(
+                        "Skipping item %s for query %s due to fuzzy mismatch against '%s'",
+                        item.id,
+                        query_id,
                         base_search_text,
-                        item.title,
-                        item.brand_title,
-                        threshold=DEFAULT_FUZZY_THRESHOLD,
                     )
-                    if fuzzy_result is None:
-                        db.update_last_timestamp(query_id, item.raw_timestamp)
-                        logger.debug(
-                            "Skipping item %s for query %s due to fuzzy mismatch against '%s'",
-                            item.id,
-                            query_id,
-                            base_search_text,
-                        )
-                        continue
-
-                valuation_engine = _get_valuation_engine()
-                valuation = valuation_engine.evaluate(
-                    item.title,
-                    item.brand_title,
-                    item.price,
-                    item.currency,
-                    base_search_text,
-                    fuzzy_result,
-                )
-
-                market_summary = format_market_summary(valuation.sold_summary)
-                active_summary = format_active_summary(valuation.active_summary)
-                fuzzy_line = format_fuzzy_line(valuation.normalization)
-                profit_line = format_profit_estimate(valuation)
-                confidence_line = format_confidence_line(valuation)
-                reference_line = build_reference_line(valuation)
-
-                # We create the message
-                content = configuration_values.MESSAGE.format(
-                    title=item.title,
-                    price=format_money(item.price, item.currency),
-                    brand=item.brand_title or "N/A",
-                    market_comps=market_summary,
-                    active_listings=active_summary,
-                    fuzzy_match=fuzzy_line,
-                    profit_estimate=profit_line,
-                    confidence=confidence_line,
-                    reference=reference_line,
-                    image=item.photo or "",
-                )
-                # add the item to the queue
-                new_items_queue.put((content, item.url, "Open Vinted", None, None))
-                # new_items_queue.put((content, item.url, "Open Vinted", item.buy_url, "Open buy page"))
-                # Add the item to the db
-                db.add_item_to_db(id=item.id, timestamp=item.raw_timestamp, price=item.price, title=item.title,
-                                  photo_url=item.photo, query_id=query_id, currency=item.currency)
+                    continue
+
+            valuation = valuation_engine.evaluate(
+                item.title,
+                item.brand_title,
+                item.price,
+                item.currency,
+                base_search_text,
+                fuzzy_result,
+            )
+
+            market_summary = format_market_summary(valuation.sold_summary)
+            active_summary = format_active_summary(valuation.active_summary)
+            fuzzy_line = format_fuzzy_line(valuation.normalization)
+            profit_line = format_profit_estimate(valuation)
+            confidence_line = format_confidence_line(valuation)
+            reference_line = build_reference_line(valuation)
+
+            # We create the message
+            content = _render_message(configuration_values.MESSAGE, {
+                "title": item.title,
+                "price": format_money(item.price, item.currency),
+                "brand": item.brand_title or "N/A",
+                "market_comps": market_summary,
+                "active_listings": active_summary,
+                "fuzzy_match": fuzzy_line,
+                "profit_estimate": profit_line,
+                "confidence": confidence_line,
+                "reference": reference_line,
+                "image": item.photo or "",
+            })
+            # add the item to the queue
+            new_items_queue.put((content, item.url, "Open Vinted", None, None))
+            # new_items_queue.put((content, item.url, "Open Vinted", item.buy_url, "Open buy page"))
+            # Add the item to the db straight away so it is never announced twice;
+            # this also moves the query timestamp forward
+            db.add_item_to_db(id=item.id, timestamp=item.raw_timestamp, price=item.price, title=item.title,
+                              photo_url=item.photo, query_id=query_id, currency=item.currency)
+            existing_ids.add(item.id)
+            last_query_timestamp = item.raw_timestamp
+            pending_timestamp = None
+    finally:
+        # Skipped items only move the timestamp, write it even if the loop was interrupted
+        if pending_timestamp is not None:
+            db.update_last_timestamp(query_id, pending_timestamp)
+
+
+# Last successful check_version result and when it was fetched (time.monotonic)
+VERSION_CHECK_TTL = 3600
+_version_cache = None
+_version_cache_ts = 0.0
 
 
 def check_version():
     """
-    Check if the application is up to date
+    Check if the application is up to date.
+    Successful checks are cached for VERSION_CHECK_TTL seconds; failed ones are retried on the next call.
     """
+    global _version_cache, _version_cache_ts
+
+    if _version_cache is not None and time.monotonic() - _version_cache_ts < VERSION_CHECK_TTL:
+        return _version_cache
+
+    ver = None
+    github_url = None
     try:
-        # Get URL from the database
-        github_url = db.get_parameter("github_url")
-        # Get version from the database
-        ver = db.get_parameter("version")
+        # Get URL and version from the database
+        github_url = configuration_values.get_cached_parameter("github_url")
+        ver = configuration_values.get_cached_parameter("version")
         # Get latest version from the repository
         url = f"{github_url}/releases/latest"
         response = requests.get(url)
@@ -415,7 +540,9 @@ def check_version():
         if response.status_code == 200:
             latest_version = response.url.split('/')[-1]
             is_up_to_date = (ver == latest_version)
-            return is_up_to_date, ver, latest_version, github_url
+            _version_cache = (is_up_to_date, ver, latest_version, github_url)
+            _version_cache_ts = time.monotonic()
+            return _version_cache
         else:
             # If we can't check, assume it's up to date
             return True, ver, ver, github_url
@@ -26,17 +26,20 @@ def create_or_update_sqlite_db(db_path):
             conn.close()
 
 
-def is_item_in_db_by_id(id):
+def get_existing_item_ids(ids):
+    ids = list(ids)
+    if not ids:
+        return set()
     conn = None
     try:
         conn = sqlite3.connect("vinted_notifications.db")
         cursor = conn.cursor()
-        cursor.execute("SELECT COUNT() FROM items WHERE item=?", (id,))
-        if cursor.fetchone()[0]:
-            return True
-        return False
+        placeholders = ", ".join("?" for _ in ids)
+        cursor.execute(f"SELECT item FROM items WHERE item IN ({placeholders})", ids)
+        return {row[0] for row in cursor.fetchall()}
     except Exception:
         print_exc()
+        return set()
     finally:
         if conn:
             conn.close()
@@ -106,34 +109,34 @@ def get_queries():
             conn.close()
 
 
-def is_query_in_db(processed_query):
+def get_existing_queries(queries):
+    queries = list(queries)
+    if not queries:
+        return set()
     conn = None
     try:
         conn = sqlite3.connect("vinted_notifications.db")
         cursor = conn.cursor()
-        # replace spaces in searched_text by % to match any query containing the searched text
-
-        cursor.execute("SELECT COUNT() FROM queries WHERE query = ?", (processed_query,))
-        if cursor.fetchone()[0]:
-            return True
-        return False
+        placeholders = ", ".join("?" for _ in queries)
+        cursor.execute(f"SELECT query FROM queries WHERE query IN ({placeholders})", queries)
+        return {row[0] for row in cursor.fetchall()}
     except Exception:
         print_exc()
-        return False
+        return set()
     finally:
         if conn:
             conn.close()
 
 
-def add_query_to_db(query, name=None):
+def add_queries_to_db(queries, name=None):
+    if not queries:
+        return
     conn = None
     try:
         conn = sqlite3.connect("vinted_notifications.db")
         cursor = conn.cursor()
-        if name:
-            cursor.execute("INSERT INTO queries (query, last_item, query_name) VALUES (?, NULL, ?)", (query, name))
-        else:
-            cursor.execute("INSERT INTO queries (query, last_item) VALUES (?, NULL)", (query,))
+        cursor.executemany("INSERT INTO queries (query, last_item, query_name) VALUES (?, NULL, ?)",
+                           [(query, name or None) for query in queries])
         conn.commit()
     except Exception:
         print_exc()
@@ -141,6 +144,7 @@ def add_query_to_db(query, name=None):
         if conn:
             conn.close()
 
+
 def remove_query_from_db(query_number):
     conn = None
     try:
@@ -2,9 +2,12 @@
 
 from __future__ import annotations
 
-from collections import deque
-from typing import Dict, Iterable, List, Optional, Tuple
+import heapq
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Dict, List, Mapping, NamedTuple, Optional, Sequence, Tuple
 
+import numpy as np
 from rapidfuzz import fuzz, process
 from rapidfuzz.distance import Levenshtein
 from unidecode import unidecode
@@ -13,7 +16,7 @@ QUERY_NAME_DELIMITER = "||"
 DEFAULT_FUZZY_THRESHOLD = 72
 MAX_VARIANTS = 5
 
-WORD_SUBSTITUTIONS: Dict[str, Iterable[str]] = {
+WORD_SUBSTITUTIONS: Dict[str, Tuple[str, ...]] = {
     "ph": ("f",),
     "f": ("ph",),
     "ck": ("k", "c"),
@@ -43,28 +46,42 @@ WORD_SUBSTITUTIONS: Dict[str, Iterable[str]] = {
     "j": ("g",),
 }
 
+# Distinct pattern lengths, longest first, used to scan each word in a single pass
+_SUB_LENGTHS: Tuple[int, ...] = tuple(sorted({len(pattern) for pattern in WORD_SUBSTITUTIONS}, reverse=True))
 
+# Punctuation treated as word separators during normalisation
+_NORM_TABLE = str.maketrans({"-": " ", "_": " ", "&": " ", "'": " "})
+
+
+class FuzzyMatch(NamedTuple):
+    """Best fuzzy match of a search text against a listing's title or brand."""
+
+    score: float
+    source: str
+    target: str
+    source_text: Optional[str]
+
+
+@lru_cache(maxsize=2048)
 def _normalize_text(text: Optional[str]) -> str:
     """Return a simplified representation of ``text`` suitable for matching."""
 
     if not text:
         return ""
 
-    normalized = unidecode(text)
-    normalized = normalized.replace("-", " ")
-    normalized = normalized.replace("_", " ")
-    normalized = normalized.replace("&", " ")
-    normalized = normalized.replace("'", " ")
-    normalized = normalized.lower()
+    # ASCII input is left untouched by unidecode, so skip the transliteration
+    normalized = text if text.isascii() else unidecode(text)
+    normalized = normalized.translate(_NORM_TABLE).lower()
     return " ".join(normalized.split())
 
 
-def _generate_word_variants(word: str) -> List[str]:
+@lru_cache(maxsize=8192)
+def _generate_word_variants(word: str) -> Tuple[str, ...]:
     """Generate single-word typo variants for ``word``."""
 
     variants: set[str] = set()
     if not word:
-        return []
+        return ()
 
     # Remove duplicated letters (Soufflenheim -> Souflenheim)
     for idx in range(len(word) - 1):
@@ -76,18 +93,20 @@ def _generate_word_variants(word: str) -> List[str]:
         if word[idx] != word[idx + 1]:
             variants.add(word[:idx] + word[idx + 1] + word[idx] + word[idx + 2 :])
 
-    # Apply substitution rules
-    for pattern in sorted(WORD_SUBSTITUTIONS, key=len, reverse=True):
-        start = 0
-        while True:
-            found = word.find(pattern, start)
-            if found == -1:
-                break
-            for replacement in WORD_SUBSTITUTIONS[pattern]:
-                variants.add(word[:found] + replacement + word[found + len(pattern) :])
-            start = found + 1
+    # Apply substitution rules: look up every window starting at each position
+    for idx in range(len(word)):
+        for length in _SUB_LENGTHS:
+            replacements = WORD_SUBSTITUTIONS.get(word[idx : idx + length])
+            if not replacements:
+                continue
+            for replacement in replacements:
+                variants.add(word[:idx] + replacement + word[idx + length :])
+
+    return tuple(variant for variant in variants if variant and variant != word)
 
-    return [variant for variant in variants if variant and variant != word]
+
+# Expanded variants keyed by the raw ``search_text``
+_variants_cache: Dict[str, Tuple[str, ...]] = {}
 
 
 def _expand_search_text_variants(search_text: str) -> List[str]:
@@ -96,9 +115,16 @@ def _expand_search_text_variants(search_text: str) -> List[str]:
     if search_text is None:
         return []
 
+    cached = _variants_cache.get(search_text)
+    if cached is None:
+        cached = _variants_cache[search_text] = _compute_search_text_variants(search_text)
+    return list(cached)
+
+
+def _compute_search_text_variants(search_text: str) -> Tuple[str, ...]:
     base = search_text.strip()
     if not base:
-        return []
+        return ()
 
     normalized_base = _normalize_text(base)
     collected: Dict[str, str] = {}
@@ -115,14 +141,12 @@ def _expand_search_text_variants(search_text: str) -> List[str]:
 
     normalized_tokens = normalized_base.split()
     if normalized_tokens:
-        sequence_key = " ".join(normalized_tokens)
-        seen_sequences = {sequence_key}
-        queue: deque[Tuple[List[str], int]] = deque()
-        queue.append((normalized_tokens, 0))
+        seen_sequences = {normalized_base}
+        # Breadth-first over (tokens, depth); the list grows while it is iterated
+        frontier: List[Tuple[List[str], int]] = [(normalized_tokens, 0)]
         limit_guard = MAX_VARIANTS * 3
 
-        while queue:
-            tokens, depth = queue.popleft()
+        for tokens, depth in frontier:
             for idx, token in enumerate(tokens):
                 for candidate in _generate_word_variants(token):
                     new_tokens = list(tokens)
@@ -131,17 +155,14 @@ def _expand_search_text_variants(search_text: str) -> List[str]:
                     if key in seen_sequences:
                         continue
                     seen_sequences.add(key)
-                    add_variant(" ".join(new_tokens))
-                    if len(collected) >= limit_guard:
-                        break
+                    add_variant(key)
                     if depth < 1:  # Allow chaining up to two edits
-                        queue.append((new_tokens, depth + 1))
-                if len(collected) >= limit_guard:
-                    break
+                        frontier.append((new_tokens, depth + 1))
             if len(collected) >= limit_guard:
                 break
 
-    scored_variants = sorted(
+    closest_variants = heapq.nsmallest(
+        MAX_VARIANTS,
         (
             (
                 Levenshtein.distance(normalized_base, key),
@@ -149,10 +170,9 @@ def _expand_search_text_variants(search_text: str) -> List[str]:
             )
             for key, value in collected.items()
         ),
-        key=lambda item: (item[0], item[1]),
     )
 
-    return [value for _, value in scored_variants][:MAX_VARIANTS]
+    return tuple(value for _, value in closest_variants)
 
 
 def encode_query_name(display_name: Optional[str], base_search_text: Optional[str]) -> Optional[str]:
@@ -171,8 +191,12 @@ def encode_query_name(display_name: Optional[str], base_search_text: Optional[st
     return None
 
 
+@lru_cache(maxsize=1024)
 def decode_query_name(raw_value: Optional[str]) -> Tuple[Optional[str], Optional[str]]:
-    """Extract display and base search text from ``raw_value``."""
+    """Extract display and base search text from ``raw_value``.
+
+    Results are memoized: stored names are short and repeat for every payload.
+    """
 
     if not raw_value:
         return None, None
@@ -187,7 +211,13 @@ def decode_query_name(raw_value: Optional[str]) -> Tuple[Optional[str], Optional
     return (cleaned or None, None)
 
 
-def _build_fuzzy_targets(base_search_text: str) -> Dict[str, str]:
+@lru_cache(maxsize=256)
+def _build_fuzzy_targets(base_search_text: str) -> Mapping[str, str]:
+    """Return the normalised match targets for ``base_search_text``.
+
+    The mapping is cached and shared between callers, so it is read-only.
+    """
+
     normalized_base = _normalize_text(base_search_text)
     targets: Dict[str, str] = {}
     if normalized_base:
@@ -195,7 +225,7 @@ def _build_fuzzy_targets(base_search_text: str) -> Dict[str, str]:
         for token in normalized_base.split():
             if len(token) >= 4 and token not in targets:
                 targets[token] = token
-    return targets
+    return MappingProxyType(targets)
 
 
 def find_best_fuzzy_match(
@@ -203,7 +233,7 @@ def find_best_fuzzy_match(
     title: Optional[str],
     brand: Optional[str] = None,
     threshold: int = DEFAULT_FUZZY_THRESHOLD,
-) -> Optional[Dict[str, object]]:
+) -> Optional[FuzzyMatch]:
     """Return the best fuzzy match result against ``title`` or ``brand``."""
 
     if not base_search_text:
@@ -213,48 +243,112 @@ def find_best_fuzzy_match(
     if not targets:
         return None
 
-    choices = list(targets.keys())
-    best: Optional[Dict[str, object]] = None
+    return find_best_fuzzy_match_prepared(
+        _normalize_text(base_search_text),
+        targets,
+        tuple(targets),
+        title,
+        brand,
+        threshold,
+    )
 
-    for source, candidate in ("title", title), ("brand", brand):
-        normalized_candidate = _normalize_text(candidate)
-        if not normalized_candidate:
-            continue
 
-        match = process.extractOne(
-            normalized_candidate,
+def find_best_fuzzy_match_prepared(
+    normalized_base: str,
+    targets: Mapping[str, str],
+    choices: Sequence[str],
+    title: Optional[str],
+    brand: Optional[str] = None,
+    threshold: int = DEFAULT_FUZZY_THRESHOLD,
+) -> Optional[FuzzyMatch]:
+    """Like :func:`find_best_fuzzy_match` with the search text prepared up front.
+
+    ``normalized_base`` is ``_normalize_text(base_search_text)``, ``targets`` comes
+    from :func:`_build_fuzzy_targets` and ``choices`` holds its keys, so a batch of
+    items sharing one search text only prepares them once.
+    """
+
+    return find_best_fuzzy_matches(normalized_base, targets, choices, [title], [brand], threshold)[0]
+
+
+def find_best_fuzzy_matches(
+    normalized_base: str,
+    targets: Mapping[str, str],
+    choices: Sequence[str],
+    titles: Sequence[Optional[str]],
+    brands: Sequence[Optional[str]],
+    threshold: int = DEFAULT_FUZZY_THRESHOLD,
+) -> List[Optional[FuzzyMatch]]:
+    """Return the best fuzzy match for every ``(title, brand)`` pair of a batch.
+
+    All candidates are scored against ``choices`` with a single
+    :func:`rapidfuzz.process.cdist` call instead of one ``extractOne`` per field.
+    """
+
+    results: List[Optional[FuzzyMatch]] = [None] * len(titles)
+    if not normalized_base or not choices:
+        return results
+
+    padded_base = f" {normalized_base} "
+    # (item index, source, raw candidate, matrix row or None for a perfect match)
+    entries: List[Tuple[int, str, Optional[str], Optional[int]]] = []
+    queries: List[str] = []
+
+    for index, (title, brand) in enumerate(zip(titles, brands)):
+        for source, candidate in ("title", title), ("brand", brand):
+            normalized_candidate = _normalize_text(candidate)
+            if not normalized_candidate:
+                continue
+            if padded_base in f" {normalized_candidate} ":
+                # Every search word appears in the candidate, which token_set_ratio
+                # scores as a perfect match, so leave it out of the matrix
+                entries.append((index, source, candidate, None))
+            else:
+                entries.append((index, source, candidate, len(queries)))
+                queries.append(normalized_candidate)
+
+    if queries:
+        scores = process.cdist(
+            queries,
             choices,
             scorer=fuzz.token_set_ratio,
             processor=None,
+            dtype=np.float64,
         )
-        if match is None:
-            continue
+        best_columns = scores.argmax(axis=1)
+
+    # Entries are in title-then-brand order, so ties keep favouring the title
+    for index, source, candidate, row in entries:
+        if row is None:
+            choice, score = normalized_base, 100.0
+        else:
+            column = best_columns[row]
+            choice, score = choices[column], float(scores[row, column])
 
-        choice, score, _ = match
         if score < threshold:
             continue
 
-        if best is None or score > best["score"]:
-            best = {
-                "score": float(score),
-                "source": source,
-                "target": targets[choice],
-                "source_text": candidate.strip() if candidate else candidate,
-            }
+        best = results[index]
+        if best is None or score > best.score:
+            results[index] = FuzzyMatch(
+                score=score,
+                source=source,
+                target=targets[choice],
+                source_text=candidate.strip() if candidate else candidate,
+            )
 
-    return best
+    return results
 
 
-def format_fuzzy_match(result: Optional[Dict[str, object]]) -> str:
+def format_fuzzy_match(result: Optional[FuzzyMatch]) -> str:
     """Format a fuzzy match ``result`` for display."""
 
     if not result:
         return "No fuzzy match"
 
-    label = "Title" if result.get("source") == "title" else "Brand"
-    score = int(round(float(result.get("score", 0))))
-    target = (result.get("target") or "").strip()
+    label = "Title" if result.source == "title" else "Brand"
+    score = int(round(float(result.score or 0)))
+    target = (result.target or "").strip()
     if target:
         return f"{label} {score}% ↔ {target}"
     return f"{label} {score}%"
-
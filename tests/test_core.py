@@ -0,0 +1,100 @@
+"""Tests for filtering scraped items before notifications are sent."""
+
+from __future__ import annotations
+
+import queue
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+import core
+from valuation_engine import ValuationEngine
+
+
+def make_item(item_id: int, timestamp: int, title: str, user_id: int = 1) -> SimpleNamespace:
+    return SimpleNamespace(
+        id=item_id,
+        raw_timestamp=timestamp,
+        title=title,
+        brand_title=None,
+        price=10.0,
+        currency="EUR",
+        photo=f"https://vinted.example/{item_id}.jpg",
+        url=f"https://vinted.example/items/{item_id}",
+        raw_data={"user": {"id": user_id}},
+    )
+
+
+class ProcessItemPayloadTests(unittest.TestCase):
+    """Check which items of a payload are announced, stored and skipped."""
+
+    QUERY_URL = "https://www.vinted.fr/catalog?search_text=luminarc"
+
+    def run_payload(self, items: list, engine: ValuationEngine) -> tuple:
+        new_items_queue = queue.Queue()
+        with mock.patch.object(core.db, "get_last_timestamp", return_value=100), mock.patch.object(
+            core.db, "get_existing_item_ids", return_value={2, 6}
+        ), mock.patch.object(core.db, "add_item_to_db") as mock_add_item, mock.patch.object(
+            core.db, "update_last_timestamp"
+        ) as mock_update_timestamp, mock.patch.object(
+            core, "get_user_country", side_effect=lambda user_id: "FR" if user_id == 1 else "US"
+        ):
+            try:
+                core._process_item_payload(
+                    (items, 7, self.QUERY_URL, None),
+                    new_items_queue,
+                    frozenset({"FR", "XX"}),
+                    engine,
+                )
+            finally:
+                self.queued = [new_items_queue.get_nowait()[1] for _ in range(new_items_queue.qsize())]
+                self.added = [call.kwargs["id"] for call in mock_add_item.call_args_list]
+                self.timestamps = [call.args for call in mock_update_timestamp.call_args_list]
+
+    def test_only_new_matching_items_are_announced(self) -> None:
+        """Old, known, disallowed and mismatching items are skipped; the newest timestamp is stored."""
+
+        # Payloads arrive newest first
+        items = [
+            make_item(6, 150, "Luminarc bowl"),
+            make_item(5, 140, "Luminarc plate"),
+            make_item(4, 130, "Wooden chair"),
+            make_item(3, 120, "Luminarc glass", user_id=2),
+            make_item(2, 110, "Luminarc cup"),
+            make_item(1, 90, "Luminarc mug"),
+        ]
+
+        self.run_payload(items, ValuationEngine(fetcher=None))
+
+        self.assertEqual(self.queued, ["https://vinted.example/items/5"])
+        self.assertEqual(self.added, [5])
+        self.assertEqual(self.timestamps, [(7, 150)])
+
+    def test_announced_items_are_stored_when_processing_fails(self) -> None:
+        """An error mid-payload keeps already announced items and skipped timestamps."""
+
+        engine = ValuationEngine(fetcher=None)
+        evaluate = engine.evaluate
+
+        def failing_evaluate(title, *args):
+            if title == "Luminarc jug":
+                raise RuntimeError("eBay unavailable")
+            return evaluate(title, *args)
+
+        engine.evaluate = failing_evaluate
+        items = [
+            make_item(12, 130, "Luminarc jug"),
+            make_item(11, 120, "Wooden chair"),
+            make_item(10, 110, "Luminarc plate"),
+        ]
+
+        with self.assertRaises(RuntimeError):
+            self.run_payload(items, engine)
+
+        self.assertEqual(self.queued, ["https://vinted.example/items/10"])
+        self.assertEqual(self.added, [10])
+        self.assertEqual(self.timestamps, [(7, 120)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -33,20 +33,39 @@ class ProcessQueryVariantsTests(unittest.TestCase):
 
         with mock.patch.object(
             core.db,
-            "is_query_in_db",
-            return_value=False,
-        ) as mock_is_query_in_db, mock.patch.object(
+            "get_existing_queries",
+            return_value=set(),
+        ) as mock_get_existing, mock.patch.object(
             core.db,
-            "add_query_to_db",
-        ) as mock_add_query:
+            "add_queries_to_db",
+        ) as mock_add_queries:
             message, is_new = core.process_query(query)
 
         self.assertTrue(is_new)
-        self.assertEqual(mock_is_query_in_db.call_count, len(expected_variants))
-        self.assertEqual(mock_add_query.call_count, len(expected_variants))
-        self.assertLessEqual(mock_add_query.call_count, MAX_VARIANTS)
+        self.assertEqual(mock_get_existing.call_count, 1)
+        self.assertEqual(mock_add_queries.call_count, 1)
+        inserted = mock_add_queries.call_args.args[0]
+        self.assertEqual(len(inserted), len(expected_variants))
+        self.assertLessEqual(len(inserted), MAX_VARIANTS)
         self.assertIn(f"{len(expected_variants)} variants considered", message)
 
+    def test_process_query_skips_existing_variants(self) -> None:
+        """Variants already stored are filtered out of the batch insert."""
+
+        query = "https://www.vinted.fr/vetements?search_text=luminarc"
+
+        with mock.patch.object(core.db, "get_existing_queries") as mock_get_existing, mock.patch.object(
+            core.db,
+            "add_queries_to_db",
+        ) as mock_add_queries:
+            mock_get_existing.side_effect = lambda queries: {queries[0]}
+            message, is_new = core.process_query(query)
+
+        inserted = mock_add_queries.call_args.args[0]
+        self.assertTrue(is_new)
+        self.assertNotIn(mock_get_existing.call_args.args[0][0], inserted)
+        self.assertIn(f"Added {len(inserted)} queries", message)
+
 
 if __name__ == "__main__":
     unittest.main()
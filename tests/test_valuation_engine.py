@@ -1,12 +1,17 @@
 from __future__ import annotations
 
+import json
 import unittest
 
+import requests
+
+from fuzzy_matcher import FuzzyMatch
 from valuation_engine import (
     CANONICAL_FUZZY_SCORE,
     LIKELY_FUZZY_SCORE,
     MAX_SOLD_COMP_RESULTS,
     EbayMarketDataFetcher,
+    ListingComp,
     ListingNormalizer,
     MarketSummary,
     ValuationEngine,
@@ -62,6 +67,48 @@ class ListingNormalizerTests(unittest.TestCase):
         self.assertEqual(result.canonical_query, "Rare Art Glass Bowl")
         self.assertEqual(result.match_quality, "unknown")
 
+    def test_identical_inputs_share_cached_result(self) -> None:
+        """Repeated listings reuse the memoised normalisation result."""
+
+        kwargs = dict(
+            title="Vintage Vase",
+            brand="Luminarc",
+            base_search_text="Vintage Vase",
+            fuzzy_result={"target": "Vintage Vase", "score": LIKELY_FUZZY_SCORE + 1},
+        )
+
+        first = self.normalizer.normalize(**kwargs)
+        second = self.normalizer.normalize(**kwargs)
+        rescored = self.normalizer.normalize(
+            **{**kwargs, "fuzzy_result": {"target": "Vintage Vase", "score": CANONICAL_FUZZY_SCORE}}
+        )
+
+        self.assertIs(first, second)
+        self.assertEqual(first.match_quality, "likely")
+        self.assertEqual(rescored.match_quality, "canonical")
+
+    def test_fuzzy_match_and_dict_normalise_alike(self) -> None:
+        """A FuzzyMatch from the matcher is read the same way as an equivalent dict."""
+
+        match = FuzzyMatch(
+            score=CANONICAL_FUZZY_SCORE,
+            source="title",
+            target="Limoges porcelain",
+            source_text="Limoges plate",
+        )
+
+        from_match = self.normalizer.normalize("Limoges plate", None, "Limoges porcelain", match)
+        from_dict = self.normalizer.normalize(
+            "Limoges plate",
+            None,
+            "Limoges porcelain",
+            {"target": "Limoges porcelain", "score": CANONICAL_FUZZY_SCORE},
+        )
+
+        self.assertEqual(from_match.fuzzy_term, "Limoges porcelain")
+        self.assertEqual(from_match.match_quality, "canonical")
+        self.assertEqual(from_match, from_dict)
+
 
 class ConfidenceScoringTests(unittest.TestCase):
     """Exercise the valuation confidence categorisation rules."""
@@ -176,6 +223,38 @@ class FetchLimitTests(unittest.TestCase):
 
         self.assertEqual(fetcher.requested_limits, [MAX_SOLD_COMP_RESULTS])
 
+    def test_sold_and_active_fetches_both_run(self) -> None:
+        """With active listings enabled, both eBay fetches feed their summaries."""
+
+        class DummyFetcher:
+            def pick_global_id(self, currency: Optional[str]) -> str:
+                return "EBAY-DE"
+
+            def fetch_sold_comps(
+                self, query: str, limit: int, global_id: Optional[str]
+            ) -> list:
+                return [ListingComp("Lamp", 40.0, "EUR", None, None, "eBay sold")]
+
+            def fetch_active_listings(
+                self, query: str, limit: int, global_id: Optional[str]
+            ) -> list:
+                return [ListingComp("Lamp", 55.0, "EUR", None, None, "eBay active")]
+
+        engine = ValuationEngine(fetcher=DummyFetcher(), active_limit=3)
+
+        result = engine.evaluate(
+            title="Vintage Lamp",
+            brand=None,
+            price=25.0,
+            currency="EUR",
+            base_search_text=None,
+            fuzzy_result=None,
+        )
+
+        self.assertEqual(result.sold_summary.median, 40.0)
+        self.assertEqual(result.active_summary.median, 55.0)
+        self.assertEqual(result.profit, 15.0)
+
     def test_fetcher_clamps_sold_entries_to_five(self) -> None:
         """Even when asked for more, the fetcher should cap the API page size."""
 
@@ -193,6 +272,10 @@ class FetchLimitTests(unittest.TestCase):
             def json(self) -> dict:
                 return self._json
 
+            @property
+            def content(self) -> bytes:
+                return json.dumps(self._json).encode()
+
         class StubSession:
             def __init__(self) -> None:
                 self.params = None
@@ -211,6 +294,154 @@ class FetchLimitTests(unittest.TestCase):
             str(MAX_SOLD_COMP_RESULTS),
         )
 
+    def test_identical_sold_queries_are_cached(self) -> None:
+        """A repeated sold comps lookup is served without another request."""
+
+        class StubResponse:
+            def raise_for_status(self) -> None:  # pragma: no cover - simple stub
+                return None
+
+            def json(self) -> dict:
+                return {"findCompletedItemsResponse": [{"searchResult": [{"item": []}]}]}
+
+            @property
+            def content(self) -> bytes:
+                return json.dumps(self.json()).encode()
+
+        class CountingSession:
+            def __init__(self) -> None:
+                self.calls = 0
+
+            def get(self, url: str, params: dict, timeout: int) -> StubResponse:
+                self.calls += 1
+                return StubResponse()
+
+        session = CountingSession()
+        fetcher = EbayMarketDataFetcher(app_id="dummy", session=session)
+        fetcher.fetch_sold_comps("foo", global_id="EBAY-DE")
+        fetcher.fetch_sold_comps("foo", global_id="EBAY-DE")
+        fetcher.fetch_sold_comps("foo", global_id="EBAY-GB")
+
+        self.assertEqual(session.calls, 2)
+        self.assertEqual(fetcher.cache_info()["sold"]["hits"], 1)
+
+    def test_active_listings_use_browse_api_with_cert_id(self) -> None:
+        """With a cert id, active listings come from the Browse API using one cached token."""
+
+        class StubResponse:
+            def __init__(self, payload: dict) -> None:
+                self._payload = payload
+
+            def raise_for_status(self) -> None:  # pragma: no cover - simple stub
+                return None
+
+            def json(self) -> dict:
+                return self._payload
+
+            @property
+            def content(self) -> bytes:
+                return json.dumps(self._payload).encode()
+
+        class BrowseSession:
+            def __init__(self) -> None:
+                self.token_requests = 0
+                self.headers = None
+
+            def post(self, url: str, auth: tuple, data: dict, timeout: int) -> StubResponse:
+                self.token_requests += 1
+                return StubResponse({"access_token": "token", "expires_in": 7200})
+
+            def get(self, url: str, params: dict, timeout: int, headers: dict) -> StubResponse:
+                self.headers = headers
+                return StubResponse(
+                    {
+                        "itemSummaries": [
+                            {
+                                "title": "Blue vase",
+                                "price": {"value": "42.50", "currency": "GBP"},
+                                "itemWebUrl": "https://ebay.example/1",
+                                "image": {"imageUrl": "https://ebay.example/1.jpg"},
+                            }
+                        ]
+                    }
+                )
+
+        session = BrowseSession()
+        fetcher = EbayMarketDataFetcher(app_id="dummy", cert_id="secret", session=session)
+        listings = fetcher.fetch_active_listings("vase", global_id="EBAY-GB")
+        fetcher.fetch_active_listings("bowl", global_id="EBAY-GB")
+
+        self.assertEqual(session.token_requests, 1)
+        self.assertEqual(session.headers["X-EBAY-C-MARKETPLACE-ID"], "EBAY_GB")
+        self.assertEqual(listings[0].price, 42.5)
+        self.assertEqual(listings[0].currency, "GBP")
+        self.assertEqual(listings[0].image, "https://ebay.example/1.jpg")
+
+    def test_active_listings_fall_back_to_finding_api_without_token(self) -> None:
+        """A failed token request, a rejected token or a site without a Browse marketplace
+        falls back to findItemsAdvanced."""
+
+        class StubResponse:
+            def __init__(self, payload: dict, status_code: int = 200) -> None:
+                self._payload = payload
+                self.status_code = status_code
+
+            def raise_for_status(self) -> None:
+                if self.status_code >= 400:
+                    raise requests.HTTPError(f"{self.status_code} error", response=self)
+
+            def json(self) -> dict:
+                return self._payload
+
+            @property
+            def content(self) -> bytes:
+                return json.dumps(self._payload).encode()
+
+        finding_payload = {
+            "findItemsAdvancedResponse": [
+                {
+                    "searchResult": [
+                        {
+                            "item": [
+                                {
+                                    "title": ["Blue vase"],
+                                    "sellingStatus": [
+                                        {"currentPrice": [{"@currencyId": "EUR", "__value__": "30.0"}]}
+                                    ],
+                                }
+                            ]
+                        }
+                    ]
+                }
+            ]
+        }
+
+        class FallbackSession:
+            def __init__(self, token_status: int, browse_status: int) -> None:
+                self.token_status = token_status
+                self.browse_status = browse_status
+                self.urls = []
+
+            def post(self, url: str, auth: tuple, data: dict, timeout: int) -> StubResponse:
+                return StubResponse({"access_token": "token", "expires_in": 7200}, self.token_status)
+
+            def get(self, url: str, params: dict, timeout: int, headers: dict = None) -> StubResponse:
+                self.urls.append(url)
+                if url == EbayMarketDataFetcher.BROWSE_ENDPOINT:
+                    return StubResponse({}, self.browse_status)
+                return StubResponse(finding_payload)
+
+        cases = ((500, 200, "EBAY-DE"), (200, 401, "EBAY-DE"), (200, 200, "EBAY-IN"))
+        for token_status, browse_status, global_id in cases:
+            with self.subTest(token_status=token_status, browse_status=browse_status, global_id=global_id):
+                session = FallbackSession(token_status, browse_status)
+                fetcher = EbayMarketDataFetcher(app_id="dummy", cert_id="secret", session=session)
+                listings = fetcher.fetch_active_listings("vase", global_id=global_id)
+
+                self.assertEqual(session.urls[-1], EbayMarketDataFetcher.ENDPOINT)
+                self.assertEqual(listings[0].price, 30.0)
+                self.assertIsNone(fetcher._access_token)
+
 
 if __name__ == "__main__":
     unittest.main()